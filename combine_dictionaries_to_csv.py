@@ -1,11 +1,22 @@
+import functools
 import os
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from glob import glob
 
 # Configuration
 WORDS_FOLDER = 'words'
 OUTPUT_CSV = 'environmental_dictionary.csv'
 
+@functools.lru_cache(maxsize=None)
+def _list_dictionaries(path):
+    """
+    Memoized sorted directory scan - repeat calls reuse the first pass
+    """
+    return tuple(sorted(glob(os.path.join(path, '*.txt'))))
+
+
 def combine_dictionaries():
     """
     Read all .txt files from words/ folder and combine into CSV
@@ -16,7 +27,7 @@ def combine_dictionaries():
     print("=" * 60)
     
     # Find all .txt files
-    txt_files = glob(os.path.join(WORDS_FOLDER, '*.txt'))
+    txt_files = _list_dictionaries(WORDS_FOLDER)
     
     if not txt_files:
         print(f"ERROR: No .txt files found in {WORDS_FOLDER}/")
@@ -27,31 +38,34 @@ def combine_dictionaries():
         print(f"  - {os.path.basename(f)}")
     print()
     
-    # Collect all words
-    all_words = []
-    
+    # Collect all words as two flat columns (no per-word dict records)
+    words_col = []
+    cats_col = []
+
     for txt_file in txt_files:
         # Get category name from filename
         category = os.path.basename(txt_file).replace('.txt', '')
-        
-        # Read words from file
-        with open(txt_file, 'r', encoding='utf-8') as f:
-            words = [line.strip() for line in f if line.strip()]
-        
-        # Add to list with category
-        for word in words:
-            all_words.append({
-                'word': word,
-                'category': category
-            })
-        
+
+        # Read words from file in one shot: a single read + decode beats
+        # per-line text-mode iteration
+        with open(txt_file, 'rb') as f:
+            lines = f.read().decode('utf-8').splitlines()
+        words = [word for word in (line.strip() for line in lines) if word]
+
+        words_col.extend(words)
+        cats_col.extend([category] * len(words))
+
         print(f"{category}: {len(words)} words")
+
+    # Create DataFrame directly from the column arrays
+    df = pd.DataFrame({'word': words_col, 'category': cats_col})
     
-    # Create DataFrame
-    df = pd.DataFrame(all_words)
-    
-    # Save to CSV
-    df.to_csv(OUTPUT_CSV, index=False, encoding='utf-8')
+    # Save to CSV via pyarrow's C++ writer (no Python per-row loop)
+    pacsv.write_csv(
+        pa.Table.from_pandas(df, preserve_index=False),
+        OUTPUT_CSV,
+        write_options=pacsv.WriteOptions(batch_size=65536)
+    )
     
     print()
     print("=" * 60)
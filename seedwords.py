@@ -1,54 +1,65 @@
-SEED_WORD_DICT = {}
-SEED_WORD_DICT['Climate_Change'] = ['carbon_footprint',
-                                    'co2_emission',
-                                    'carbon_emissions',
-                                    'climate_change',
-                                    'ghg_emission',
-                                    'global_warming',
-                                    'greenhouse_gas',
-                                    'scope_1',
-                                    'scope_2',
-                                    'scope_3']
+"""
+Canonical ESG seed words, one category per entry.
+
+Values are frozensets so membership checks against the token stream are
+O(1) with cached hashes; ALL_SEEDS is the union for the common
+"is this token a seed word at all?" check.
+"""
+
+SEED_WORD_DICT: dict = {}
+SEED_WORD_DICT['Climate_Change'] = frozenset(['carbon_footprint',
+                                              'co2_emission',
+                                              'carbon_emissions',
+                                              'climate_change',
+                                              'ghg_emission',
+                                              'global_warming',
+                                              'greenhouse_gas',
+                                              'scope_1',
+                                              'scope_2',
+                                              'scope_3'])
 # Sources: GRI 305 Emissions 2016; IPCC AR6 WGI Annex VII; IPCC AR6 SPM
 
-SEED_WORD_DICT['Natural_Resources'] = ['electricity_consumption',
-                                       'energy_consumption',
-                                       'fossil_fuel',
-                                       'heating_consumption',
-                                       'steam_consumption',
-                                       'water_consumption',
-                                       'gas_consumption',
-                                       'renewable_energy']
+SEED_WORD_DICT['Natural_Resources'] = frozenset(['electricity_consumption',
+                                                 'energy_consumption',
+                                                 'fossil_fuel',
+                                                 'heating_consumption',
+                                                 'steam_consumption',
+                                                 'water_consumption',
+                                                 'gas_consumption',
+                                                 'renewable_energy'])
 # Sources: GRI 302 Energy 2016; GRI 303 Water and Effluents 2018
 
-SEED_WORD_DICT['Pollution'] = ['air_pollution',
-                               'air_quality',
-                               'particulate_matter',
-                               'pollution',
-                               'hazardous_waste',
-                               'toxic_waste',
-                               'toxic_emissions']
+SEED_WORD_DICT['Pollution'] = frozenset(['air_pollution',
+                                         'air_quality',
+                                         'particulate_matter',
+                                         'pollution',
+                                         'hazardous_waste',
+                                         'toxic_waste',
+                                         'toxic_emissions'])
 # Sources: GRI 305 Emissions 2016; GRI 306 Effluents and Waste 2016; MSCI ESG
 
-SEED_WORD_DICT['Ecosystem'] = ['biodiversity',
-                               'deforestation',
-                               'natural_habitat',
-                               'reforestation',
-                               'fauna_and_flora']
+SEED_WORD_DICT['Ecosystem'] = frozenset(['biodiversity',
+                                         'deforestation',
+                                         'natural_habitat',
+                                         'reforestation',
+                                         'fauna_and_flora'])
 # Sources: GRI 304 Biodiversity 2016; IPCC AR6 Annex VII
 
-SEED_WORD_DICT['Environmental_Goals'] = ['carbon_neutral',
-                                         'carbon_neutrality',
-                                         'net_zero',
-                                         'decarbonization',
-                                         'circular_economy']
+SEED_WORD_DICT['Environmental_Goals'] = frozenset(['carbon_neutral',
+                                                   'carbon_neutrality',
+                                                   'net_zero',
+                                                   'decarbonization',
+                                                   'circular_economy'])
 # Sources: IPCC AR6 Annex VII; UN Global Indicator Framework 2023
 
-SEED_WORD_DICT['Sustainable_Reporting'] = ['esg',
-                                           'esg_ratings',
-                                           'environmental_social_governance',
-                                           'sustainability_reporting',
-                                           'gri_standards',
-                                           'gri',
-                                           'global_reporting_initiative']
+SEED_WORD_DICT['Sustainable_Reporting'] = frozenset(['esg',
+                                                     'esg_ratings',
+                                                     'environmental_social_governance',
+                                                     'sustainability_reporting',
+                                                     'gri_standards',
+                                                     'gri',
+                                                     'global_reporting_initiative'])
 # Sources: GRI Standards 301-306; MSCI ESG
+
+# Union of every category, for fast "is this token a seed?" lookups
+ALL_SEEDS = frozenset().union(*SEED_WORD_DICT.values())
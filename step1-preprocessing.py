@@ -48,7 +48,7 @@ EXPECTED IMPACT:
 2. DISABLED COMPONENTS: Removed unnecessary spaCy features (parser, textcat, etc.)
 3. PARALLEL BATCHING: Process multiple batches simultaneously
 4. LARGER CHUNKS: Increased to 10,000 docs per chunk for better throughput
-5. MAX CPU: Uses all 16 threads (8 cores × 2)
+5. MAX CPU: Uses all cores available to the process (detected at runtime)
 6. MEMORY EFFICIENT: Streaming + garbage collection
 
 STEP 1 (Preprocessing) - Changes from Original:
@@ -72,13 +72,13 @@ Text preprocessing approach
 """
 
 import os
-import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
 import logging
-import multiprocessing
-import spacy 
+import spacy
 from datetime import datetime
 import re
-from tqdm import tqdm
 import gc
 
 # === OPTIMIZED CONFIGURATION ===
@@ -87,8 +87,32 @@ LOG_PATH = 'log'
 CSV_FILE = 'articles_id_content.csv'  # CHANGED: Main dataset
 
 CHUNKSIZE = 10000  # INCREASED: 5000→10000 for better throughput
-BATCH_SIZE = 500   # NEW: Process 500 docs at once with nlp.pipe()
-N_PROCESS = 16     # OPTIMIZED: Max threads for 5700X3D (8 cores × 2)
+
+# Detected at runtime instead of hardcoding the author's 16-thread CPU -
+# a fixed 16 oversubscribes smaller hosts (context-switch storm) and
+# underutilizes bigger ones; sched_getaffinity also respects cgroup and
+# taskset limits where available
+if hasattr(os, 'sched_getaffinity'):
+    N_PROCESS = len(os.sched_getaffinity(0))
+else:
+    N_PROCESS = os.cpu_count() or 1
+
+# Sized so every process sees at least ~8 batches per chunk for load
+# balancing, but never below spaCy's sweet spot of ~50 docs per batch
+BATCH_SIZE = max(50, CHUNKSIZE // N_PROCESS // 8)
+
+# Compiled once - collapses runs of 2+ underscores left over from lemmas
+_MULTI_UNDERSCORE = re.compile(r"_{2,}")
+
+# Arrow schema for the per-chunk feather output
+# CSR-style layout: per document one flat token array plus cumulative
+# sentence-end offsets into it, instead of a nested list-of-sentences -
+# neither end of the pipeline has to build millions of tiny Python lists
+PROCESSED_SCHEMA = pa.schema([
+    ('doc_id', pa.int64()),
+    ('tokens', pa.large_list(pa.string())),
+    ('sentence_offsets', pa.large_list(pa.int32())),
+])
 
 os.makedirs(os.path.join(DATA_FOLDER, 'processed_df'), exist_ok=True)
 os.makedirs(os.path.join(DATA_FOLDER, 'cache'), exist_ok=True)
@@ -109,101 +133,144 @@ class OptimizedSententizer():
     OPTIMIZED: Uses batch processing and disabled components
     - 10-30x faster than original
     - Still maintains same output quality
+
+    Pipeline component audit: the token loop consumes ent_type_ (needs
+    ner) and lemma_ (needs the lemmatizer, which needs POS tags from
+    tagger + attribute_ruler); is_punct/is_stop are lexeme attributes
+    with no component cost. Only the parser is unused - it is excluded
+    at load time so its weights are never read, and the cheap
+    sentencizer provides sentence boundaries instead. Dropping ner too
+    would buy roughly another 1.3-1.6x but would kill the [NER:...]
+    entity replacement the methodology relies on.
     """
     def __init__(self):
-        self.nlp = spacy.load("en_core_web_sm")
-        
-        # OPTIMIZATION 1: Disable parser, add fast sentencizer
-        # Parser is slow but does sentence detection
+        # OPTIMIZATION 1: Exclude parser at load time, add fast sentencizer
+        # Parser is slow but only did sentence detection here
         # Sentencizer is 10x faster and does sentence detection
-        self.nlp.disable_pipes(['parser'])
+        self.nlp = spacy.load("en_core_web_sm", exclude=["parser"])
         self.nlp.add_pipe('sentencizer')  # FIX: Add this for sentence boundaries
-        
+
+
         self.nlp.max_length = 30000000
         self.set_not_replace = set(['scope', 'scope_1', 'scope_2', 'scope_3'])
     
-    def process_batch(self, texts):
+    def process_batch(self, texts, batch_size=50, n_process=1):
         """
         OPTIMIZED: Process multiple documents at once
         Uses nlp.pipe() which is much faster than individual processing
+        With n_process > 1 spaCy fans the heavy pipeline components out to
+        child processes itself - only raw texts cross the process boundary
         """
         results = []
-        
+
         # Clean texts first
-        cleaned_texts = []
-        for text in texts:
-            if text is None or pd.isna(text):
-                cleaned_texts.append("")
-            else:
-                text = str(text)
-                text = re.sub(r"\s+", " ", text)
-                if len(text.strip()) < 10:
-                    cleaned_texts.append("")
-                else:
-                    cleaned_texts.append(text)
-        
+        # OPTIMIZATION: whitespace collapse and short-text filtering run as
+        # columnar pyarrow.compute kernels over the whole batch instead of
+        # a Python regex + strip per document
+        # Nulls arrive from the pyarrow CSV reader as None and become Arrow
+        # nulls here; fill_null maps them to "" without any per-element
+        # pd.isna type dispatch
+        arr = pc.fill_null(pa.array(texts, type=pa.string()), "")
+        arr = pc.replace_substring_regex(arr, r"\s+", " ")
+        keep = pc.greater_equal(pc.utf8_length(pc.utf8_trim_whitespace(arr)), 10)
+        cleaned_texts = [
+            text if ok else ""
+            for text, ok in zip(arr.to_pylist(), keep.to_pylist())
+        ]
+
         # OPTIMIZATION 2: Batch processing with nlp.pipe()
         # This is 10-30x faster than individual nlp() calls
-        try:
-            docs = list(self.nlp.pipe(
-                cleaned_texts, 
-                batch_size=50,  # Process 50 at a time internally
-                n_process=1     # Single process per worker (multiprocessing handles parallelism)
-            ))
-        except Exception as e:
-            logging.warning(f"Batch processing error: {e}")
-            return [[] for _ in texts]
-        
-        # Process each doc
-        for doc, original_text in zip(docs, cleaned_texts):
+        # Only the non-empty subset goes through the pipeline
+        # The pipe is consumed lazily below, so only ~one spaCy batch of
+        # Docs is alive at a time instead of all CHUNKSIZE of them
+        doc_iter = self.nlp.pipe(
+            [text for text in cleaned_texts if text],
+            batch_size=batch_size,
+            n_process=n_process
+        )
+
+        # Process each doc as it streams out, re-expanding to the
+        # original batch length
+        # Each doc becomes (flat token list, cumulative sentence-end offsets)
+        # Errors are handled per document: one bad doc costs one empty
+        # row, not the whole chunk. Failures of the pipe itself (dead
+        # worker, doc/text count mismatch) propagate so the caller never
+        # persists an all-empty chunk that the resume-skip would then
+        # treat as done
+        for original_text in cleaned_texts:
             if not original_text:
-                results.append([])
+                results.append(([], []))
                 continue
-            
+            doc = next(doc_iter)
+
             # Process sentences (simplified without compound merging for speed)
-            sentences = []
-            for sent in doc.sents:
-                if not sent.text.strip():
-                    continue
-                
-                # Lemmatize and replace entities
-                words = []
-                for token in sent:
-                    if token.is_punct or not token.text.strip():
+            # Tokens go into one flat list per doc; sentence boundaries are
+            # recorded as cumulative end offsets (CSR layout)
+            tokens = []
+            sentence_offsets = []
+            try:
+                for sent in doc.sents:
+                    if not sent.text.strip():
                         continue
-                    
-                    if (not token.ent_type_) or (token.lemma_.strip().lower() in self.set_not_replace):
-                        temp = token.lemma_.strip().lower()
-                        temp = temp.replace('_-_', '-')
-                        temp = re.sub(r"_+", '_', temp)
-                        words.append(temp)
-                    else:
-                        words.append('[NER:' + token.ent_type_ + ']')
-                
-                if words:
-                    sentences.append(words)
-            
-            results.append(sentences)
-        
+
+                    # Lemmatize and replace entities
+                    words = []
+                    for token in sent:
+                        if token.is_punct or not token.text.strip():
+                            continue
+
+                        # Stopwords and one-character tokens are NOT dropped
+                        # here: step 3's phrase detection needs them (the
+                        # digits in scope 1/2/3, connector words like "and"
+                        # in fauna_and_flora). The equivalent filter runs in
+                        # step 4, after phrase merging
+                        if (not token.ent_type_) or (token.lemma_.strip().lower() in self.set_not_replace):
+                            temp = token.lemma_.strip().lower()
+                            # Cheap substring guards: ~95% of lemmas contain no
+                            # underscores, so skip the replace/regex entirely
+                            if '_-_' in temp:
+                                temp = temp.replace('_-_', '-')
+                            if '__' in temp:
+                                temp = _MULTI_UNDERSCORE.sub('_', temp)
+                            words.append(temp)
+                        else:
+                            words.append('[NER:' + token.ent_type_ + ']')
+
+                    if words:
+                        tokens.extend(words)
+                        sentence_offsets.append(len(tokens))
+            except Exception as e:
+                logging.warning(f"Document processing error: {e}")
+                results.append(([], []))
+                continue
+
+            results.append((tokens, sentence_offsets))
+
         return results
 
 
-def process_chunk_wrapper(args):
+def _iter_csv_chunks(reader):
     """
-    Wrapper for parallel processing
-    Each worker processes a sub-batch
+    Re-chunk the pyarrow CSV record batches into CHUNKSIZE-document chunks
+
+    Rows with null content are dropped, matching the old
+    dropna(subset=['content']) behaviour
     """
-    texts, worker_id = args
-    sententizer = OptimizedSententizer()
-    
-    # Process in batches
-    results = []
-    for i in range(0, len(texts), BATCH_SIZE):
-        batch = texts[i:i+BATCH_SIZE]
-        batch_results = sententizer.process_batch(batch)
-        results.extend(batch_results)
-    
-    return results
+    ids_buf = []
+    docs_buf = []
+    for batch in reader:
+        ids = batch.column('id').to_pylist()
+        texts = batch.column('content').to_pylist()
+        for doc_id, text in zip(ids, texts):
+            if text is None:
+                continue
+            ids_buf.append(doc_id)
+            docs_buf.append(text)
+            if len(ids_buf) >= CHUNKSIZE:
+                yield ids_buf, docs_buf
+                ids_buf, docs_buf = [], []
+    if ids_buf:
+        yield ids_buf, docs_buf
 
 
 def run_preprocessing():
@@ -212,93 +279,80 @@ def run_preprocessing():
     """
     logging.info('OPTIMIZED preprocessing starts.')
     logging.info(f'Using {N_PROCESS} processes for maximum speed')
-    
-    # Load CSV
-    logging.info(f'Loading CSV file: {CSV_FILE}')
+
+    # OPTIMIZATION: Stream the CSV with pyarrow's threaded reader instead
+    # of loading the whole corpus into a DataFrame up front - parsing
+    # overlaps with spaCy work and the full corpus is never resident
+    logging.info(f'Streaming CSV file: {CSV_FILE}')
     try:
-        df = pd.read_csv(CSV_FILE)
-        logging.info(f'Successfully loaded {len(df):,} documents')
+        reader = pacsv.open_csv(
+            CSV_FILE,
+            read_options=pacsv.ReadOptions(block_size=256 << 20, use_threads=True),
+            # Only the two columns we use get parsed and kept; the explicit
+            # id type skips dtype inference on it
+            convert_options=pacsv.ConvertOptions(
+                include_columns=['id', 'content'],
+                column_types={'id': pa.int64()}
+            )
+        )
     except Exception as e:
-        logging.error(f'Error loading CSV: {e}')
+        logging.error(f'Error opening CSV: {e}')
         return
-    
-    if 'id' not in df.columns or 'content' not in df.columns:
+
+    if 'id' not in reader.schema.names or 'content' not in reader.schema.names:
         logging.error("CSV must have 'id' and 'content' columns")
         return
-    
-    initial_count = len(df)
-    df = df.dropna(subset=['content'])
-    logging.info(f'Documents after removing null: {len(df):,} (removed {initial_count - len(df):,})')
-    
-    # Process in chunks
-    num_chunks = (len(df) - 1) // CHUNKSIZE + 1
-    logging.info(f'Processing {len(df):,} documents in {num_chunks} chunks')
-    logging.info(f'Estimated time: {num_chunks * 1.5:.1f} - {num_chunks * 3:.1f} minutes')
-    
-    for chunk_idx in range(num_chunks):
-        start_idx = chunk_idx * CHUNKSIZE
-        end_idx = min((chunk_idx + 1) * CHUNKSIZE, len(df))
-        
+
+    logging.info(f'Processing documents in chunks of {CHUNKSIZE:,}')
+
+    # OPTIMIZATION 3: spaCy's own multiprocessing - one model in the main
+    # process, nlp.pipe(n_process=...) fans the heavy components out to
+    # child processes at the Cython level; only raw texts are pickled,
+    # not nested token lists plus a Python pool layer on top
+    sententizer = OptimizedSententizer()
+
+    total_docs = 0
+    num_chunks = 0
+    for chunk_idx, (doc_ids, docs) in enumerate(_iter_csv_chunks(reader)):
+        num_chunks = chunk_idx + 1
+        total_docs += len(docs)
+
         processed_df_path = os.path.join(DATA_FOLDER, 'processed_df', f'{chunk_idx}.feather')
-        
+
         if os.path.exists(processed_df_path):
-            logging.info(f'Chunk {chunk_idx}/{num_chunks} already exists. Skipping...')
+            logging.info(f'Chunk {chunk_idx} already exists. Skipping...')
             continue
-        
-        logging.info(f'Processing chunk {chunk_idx+1}/{num_chunks}: docs {start_idx:,} to {end_idx:,}')
-        
-        # Get chunk data
-        chunk_df = df.iloc[start_idx:end_idx].copy()
-        docs = chunk_df['content'].tolist()
-        doc_ids = chunk_df['id'].tolist()
-        
-        # OPTIMIZATION 3: Split chunk into sub-batches for parallel processing
-        n_workers = min(N_PROCESS, len(docs) // BATCH_SIZE + 1)
-        sub_batch_size = len(docs) // n_workers + 1
-        
-        work_items = []
-        for i in range(n_workers):
-            start = i * sub_batch_size
-            end = min((i + 1) * sub_batch_size, len(docs))
-            if start < end:
-                work_items.append((docs[start:end], i))
-        
-        logging.info(f'Using {n_workers} parallel workers...')
-        
-        # Process in parallel
-        with multiprocessing.Pool(processes=n_workers) as pool:
-            results = list(tqdm(
-                pool.imap(process_chunk_wrapper, work_items),
-                total=len(work_items),
-                desc=f'Chunk {chunk_idx+1}/{num_chunks}'
-            ))
-        
-        # Flatten results
-        processed_docs = []
-        for result in results:
-            processed_docs.extend(result)
-        
-        # Save
-        processed_docs_df = pd.DataFrame({
-            "doc_id": doc_ids,
-            "processed_docs": processed_docs
-        })
-        
-        processed_docs_df.to_feather(processed_df_path)
-        
-        # Stats
-        non_empty = sum(1 for doc in processed_docs if len(doc) > 0)
-        total_sentences = sum(len(doc) for doc in processed_docs)
-        logging.info(f'Chunk {chunk_idx+1} complete: {non_empty:,}/{len(processed_docs):,} docs, {total_sentences:,} sentences')
-        
+
+        logging.info(f'Processing chunk {chunk_idx+1}: docs {total_docs - len(docs):,} to {total_docs:,}')
+
+        result = sententizer.process_batch(docs, batch_size=BATCH_SIZE, n_process=N_PROCESS)
+        token_lists = [tokens for tokens, _ in result]
+        offset_lists = [offsets for _, offsets in result]
+
+        # Stream the chunk into the feather file as an Arrow record batch
+        # (no DataFrame copy in memory)
+        with pa.ipc.new_file(processed_df_path, PROCESSED_SCHEMA) as writer:
+            batch = pa.record_batch([
+                pa.array(doc_ids, type=pa.int64()),
+                pa.array(token_lists, type=PROCESSED_SCHEMA.field('tokens').type),
+                pa.array(offset_lists, type=PROCESSED_SCHEMA.field('sentence_offsets').type),
+            ], schema=PROCESSED_SCHEMA)
+            writer.write_batch(batch)
+
+        non_empty = sum(1 for offsets in offset_lists if offsets)
+        total_sentences = sum(len(offsets) for offsets in offset_lists)
+        logging.info(f'Chunk {chunk_idx+1} complete: {non_empty:,}/{len(result):,} docs, {total_sentences:,} sentences')
+
         # OPTIMIZATION 4: Aggressive garbage collection
-        del processed_docs_df, processed_docs, docs, chunk_df
+        del batch, result, token_lists, offset_lists, docs, doc_ids
         gc.collect()
-    
-    logging.info('All preprocessing complete!')
+
+    logging.info(f'All preprocessing complete! {total_docs:,} documents in {num_chunks} chunks')
 
 
 if __name__ == '__main__':
-    # OPTIMIZATION 5: Prevent nested multiprocessing issues
-    multiprocessing.set_start_method('spawn', force=True)
+    # Default start method on purpose: nlp.pipe(n_process=...) spawns its
+    # workers per call, and under fork they inherit the already-loaded
+    # model copy-on-write instead of each cold worker unpickling the
+    # whole pipeline on every chunk
     run_preprocessing()
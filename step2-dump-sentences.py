@@ -10,14 +10,15 @@ WHAT THIS DOES:
 - Creates input format for Word2Vec training
 
 === OPTIMIZATIONS ===
-1. Buffered writing (faster I/O)
-2. Progress tracking
-3. Memory efficient (processes one file at a time)
+1. Bulk binary writing (one write per chunk instead of per sentence)
+2. Threaded feather decoding overlapped with writing
+3. Progress tracking
+4. Memory efficient (writes one file at a time)
 
 STEP 2 (Dump Sentences) - Changes from Original:
 CHANGED:
 
-Added: Buffered writing (1MB buffer for faster I/O)
+Added: Bulk binary writing (8MB buffer, one write per chunk)
 Added: Progress bar with tqdm
 Added: Detailed statistics (doc count, sentence count, file size)
 Added: Better logging messages
@@ -31,16 +32,21 @@ File paths and structure
 @author: Optimized from Yan LIN's code
 """
 
-import pandas as pd
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import functools
 from glob import glob
 import logging
 import os
+
+import pyarrow.feather as feather
 from tqdm import tqdm
 
 # === CONFIGURATION ===
 PROCESSED_DF_PATH = 'data/processed_df'
 DUMP_PATH = 'all_sentences'
 LOG_PATH = 'log'
+READ_WORKERS = 8  # Concurrent feather readers (pyarrow releases the GIL)
 
 os.makedirs(DUMP_PATH, exist_ok=True)
 
@@ -54,13 +60,30 @@ logging.basicConfig(
 )
 
 
+@functools.lru_cache(maxsize=None)
+def _list_feathers(path):
+    """
+    Memoized sorted directory scan - repeated calls (notebook re-runs,
+    orchestrators importing this module) reuse the first stat pass
+    """
+    return tuple(sorted(glob(os.path.join(path, '*.feather'))))
+
+
+def _load_table(f_name):
+    """
+    Read one feather chunk (only the columns we need)
+    Runs in a worker thread; pyarrow releases the GIL during the IPC read
+    """
+    return feather.read_table(f_name, columns=['tokens', 'sentence_offsets'])
+
+
 def run_dump_all_sentences():
     """
     OPTIMIZED: Faster writing with buffering and progress tracking
     """
     
     # Find all processed feather files
-    process_files = sorted(glob(os.path.join(PROCESSED_DF_PATH,'*.feather')))
+    process_files = _list_feathers(PROCESSED_DF_PATH)
     out_file = os.path.join(DUMP_PATH,'all.txt')
     
     logging.info("=" * 60)
@@ -74,28 +97,57 @@ def run_dump_all_sentences():
     total_docs = 0
     total_sentences = 0
     
-    # OPTIMIZATION: Buffered writing (faster I/O)
-    with open(out_file, 'w', encoding='utf-8', buffering=1024*1024) as f:
-        
-        # Process each feather file with progress bar
-        for f_name in tqdm(process_files, desc="Processing chunks"):
-            
-            # Read feather file
-            df = pd.read_feather(f_name)
-            
-            # Extract and write sentences
-            for doc in df.processed_docs.tolist():
-                for sentence in doc:
-                    # Skip empty sentences
-                    if len(sentence) == 0:
-                        continue
-                    
-                    # Write sentence as space-separated words
-                    f.write(' '.join(sentence) + '\n')
-                    total_sentences += 1
-                
-            total_docs += df.shape[0]
-        
+    # OPTIMIZATION: Binary bulk writing - encode each chunk into one bytes
+    # payload and hand it to the kernel in a single write() per feather
+    # file instead of ~20M per-sentence write() calls
+    #
+    # OPTIMIZATION: Feather decoding runs in a thread pool (pyarrow drops
+    # the GIL during IPC reads) so the next chunks decode while the main
+    # thread writes the current one. Prefetch is bounded: at most
+    # READ_WORKERS tables are in flight, and the next file is only
+    # submitted once a table has been consumed - the C++ reads are much
+    # faster than the Python-side encode/write, so an unbounded
+    # executor.map would pile nearly the whole corpus up in RAM
+    with open(out_file, 'wb', buffering=8*1024*1024) as f, \
+         ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+
+        pending = deque(
+            executor.submit(_load_table, f_name)
+            for f_name in process_files[:READ_WORKERS]
+        )
+        remaining = iter(process_files[READ_WORKERS:])
+
+        # Process each feather file with progress bar (FIFO order, so the
+        # output file keeps the sorted chunk order)
+        progress = tqdm(total=len(process_files), desc="Processing chunks")
+        while pending:
+            table = pending.popleft().result()
+            next_file = next(remaining, None)
+            if next_file is not None:
+                pending.append(executor.submit(_load_table, next_file))
+
+            # Flatten all sentences of this chunk into one buffer
+            # Each doc is a flat token list plus cumulative sentence-end
+            # offsets (CSR layout), so sentences are just slices of it
+            parts = []
+            for tokens, offsets in zip(table.column('tokens').to_pylist(),
+                                       table.column('sentence_offsets').to_pylist()):
+                start = 0
+                for end in offsets:
+                    if end > start:
+                        parts.append(' '.join(tokens[start:end]).encode('utf-8'))
+                    start = end
+
+            if parts:
+                f.write(b'\n'.join(parts))
+                f.write(b'\n')
+
+            total_sentences += len(parts)
+            total_docs += table.num_rows
+            progress.update(1)
+
+        progress.close()
+
     # Final statistics
     file_size_mb = os.path.getsize(out_file) / (1024 * 1024)
     
@@ -7,7 +7,7 @@ WHAT THIS DOES:
 - Scans through 20M sentences to find common word combinations
 - Example: "climate" + "change" appears together often → "climate_change"
 - Creates models that will transform text in next step
-- Saves to bigram_trigram_model/all_bigram_trigram_1.pkl
+- Saves frozen models to bigram_trigram_model/all_bigram_trigram_1.{bigram,trigram}
 
 === CHANGES FROM ORIGINAL ===
 1. ADDED: Detailed logging and progress messages
@@ -35,6 +35,32 @@ NGRAM_PATH = 'bigram_trigram_model'
 MIN_COUNT = 5   # Phrase must appear at least 5 times
 THRESHOLD = 1   # Lower = more phrases detected (1 = very permissive)
 
+# ESG-specific phrases injected into the frozen models with an infinite
+# score so they are always merged into single units. Baked in here, at
+# save time, so the artifacts on disk already contain them and no
+# downstream consumer has to mutate phrasegrams after loading
+INF = float('inf')
+ESG_BIGRAMS = {
+    'scope_1': INF,
+    'scope_2': INF,
+    'scope_3': INF,
+    'ecological_impact': INF,
+
+    'employee_engagement': INF,
+    'customer_welfare': INF,
+    'product_safety': INF,
+    'responsible_marketing': INF,
+    'product_quality': INF,
+
+    'community_development': INF,
+    'community_relation': INF,
+    'social_capital': INF,
+    'social_impact': INF,
+}
+ESG_TRIGRAMS = {
+    'supply_chain_sustainability': INF,
+}
+
 os.makedirs(NGRAM_PATH, exist_ok=True)
 
 logging.basicConfig(
@@ -47,13 +73,41 @@ logging.basicConfig(
 )
 
 
+def _tee_sentences(sentences, cache_file):
+    """
+    Yield each sentence unchanged while appending it to a pickle stream
+
+    The bigram pass has to stream all.txt once anyway; the tee lets the
+    trigram pass read back compact pickled token lists instead of
+    re-reading and re-tokenizing the whole 20M-line text file
+    """
+    with open(cache_file, 'wb', buffering=8*1024*1024) as f:
+        for sentence in sentences:
+            pickle.dump(sentence, f, protocol=pickle.HIGHEST_PROTOCOL)
+            yield sentence
+
+
+def _read_teed_sentences(cache_file):
+    """
+    Stream sentences back from the pickle cache written during pass 1
+    """
+    with open(cache_file, 'rb', buffering=8*1024*1024) as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
 def run_bigram_trigram():
     """
     OPTIMIZED: Build bigram and trigram models with progress tracking
     """
     
     out_file = os.path.join(DUMP_PATH,'all.txt')
-    ngram_file_path = os.path.join(NGRAM_PATH, f'all_bigram_trigram_{THRESHOLD}.pkl')
+    ngram_base_path = os.path.join(NGRAM_PATH, f'all_bigram_trigram_{THRESHOLD}')
+    bigram_path = ngram_base_path + '.bigram'
+    trigram_path = ngram_base_path + '.trigram'
     
     logging.info("=" * 60)
     logging.info("STEP 3: BIGRAM/TRIGRAM DETECTION")
@@ -63,17 +117,17 @@ def run_bigram_trigram():
     logging.info(f"Threshold: {THRESHOLD} (lower = more phrases)")
     logging.info(f"Expected time: 15-30 minutes")
     logging.info("=" * 60)
-    
+
     # Check if already exists
-    if os.path.exists(ngram_file_path):
+    if os.path.exists(bigram_path) and os.path.exists(trigram_path):
         logging.info("Bigram/trigram model already exists. Skipping...")
-        
+
         # Show what's in it
-        with open(ngram_file_path, 'rb') as f:
-            bigram, trigram = pickle.load(f)
+        bigram = Phraser.load(bigram_path)
+        trigram = Phraser.load(trigram_path)
         logging.info(f"Loaded existing model:")
-        logging.info(f"  Bigram vocab size: {len(bigram.vocab):,}")
-        logging.info(f"  Trigram vocab size: {len(trigram.vocab):,}")
+        logging.info(f"  Bigram phrases: {len(bigram.phrasegrams):,}")
+        logging.info(f"  Trigram phrases: {len(trigram.phrasegrams):,}")
         return
     
     # Load sentences
@@ -84,44 +138,61 @@ def run_bigram_trigram():
     logging.info("Building BIGRAM model (pass 1/2)...")
     logging.info("This scans all 20M sentences to find 2-word phrases...")
     
+    # OPTIMIZATION: tee pass 1 into a binary token cache so pass 2 does
+    # not have to re-read and re-split the whole text file from disk
+    token_cache = os.path.join(DUMP_PATH, 'all.tokens.pkl')
+
     bigram = Phrases(
-        processed_sentences, 
+        _tee_sentences(processed_sentences, token_cache),
         min_count=MIN_COUNT,
         connector_words=ENGLISH_CONNECTOR_WORDS,
-        delimiter="_", 
-        threshold=THRESHOLD
+        delimiter="_",
+        threshold=THRESHOLD,
+        progress_per=1_000_000
     )
-    
+
     logging.info(f"Bigram model complete! Found {len(bigram.vocab):,} vocabulary items")
-    
+
     # STEP 3B: Build trigram model on top of bigrams
     logging.info("Building TRIGRAM model (pass 2/2)...")
-    logging.info("This scans sentences again to find 3-word phrases...")
-    
-    # Reload sentences (LineSentence is a generator, need fresh one)
-    processed_sentences = LineSentence(out_file)
-    
+    logging.info("This scans the cached token stream again to find 3-word phrases...")
+
     trigram = Phrases(
-        bigram[processed_sentences],  # Apply bigram first, then find trigrams
+        bigram[_read_teed_sentences(token_cache)],  # Apply bigram first, then find trigrams
         min_count=MIN_COUNT,
         connector_words=ENGLISH_CONNECTOR_WORDS,
         delimiter="_",
-        threshold=THRESHOLD
+        threshold=THRESHOLD,
+        progress_per=1_000_000
     )
-    
+
     logging.info(f"Trigram model complete! Found {len(trigram.vocab):,} vocabulary items")
+
+    # The token cache only exists to feed pass 2
+    os.remove(token_cache)
     
-    # Save both models
+    # Save both models as frozen Phrasers: downstream only *applies* the
+    # phrases, so the huge training vocab dicts stay out of the files
     logging.info("Saving models...")
-    with open(ngram_file_path,'wb') as f:
-        pickle.dump((bigram, trigram), f)
-    
-    file_size_mb = os.path.getsize(ngram_file_path) / (1024 * 1024)
-    
+    frozen_bigram = bigram.freeze()
+    frozen_trigram = trigram.freeze()
+
+    # One bulk update per model on the frozen phrasegrams tables, before
+    # save - the frozen scorer then treats the injected ESG phrases like
+    # any corpus-detected phrase
+    logging.info("Injecting ESG-specific phrases...")
+    frozen_bigram.phrasegrams.update(ESG_BIGRAMS)
+    frozen_trigram.phrasegrams.update(ESG_TRIGRAMS)
+
+    frozen_bigram.save(bigram_path)
+    frozen_trigram.save(trigram_path)
+
+    file_size_mb = (os.path.getsize(bigram_path) + os.path.getsize(trigram_path)) / (1024 * 1024)
+
     logging.info("=" * 60)
     logging.info("SUCCESS: Bigram/Trigram models saved!")
-    logging.info(f"Output file: {ngram_file_path}")
-    logging.info(f"File size: {file_size_mb:.2f} MB")
+    logging.info(f"Output files: {bigram_path}, {trigram_path}")
+    logging.info(f"Total file size: {file_size_mb:.2f} MB")
     logging.info(f"Bigram vocab: {len(bigram.vocab):,} items")
     logging.info(f"Trigram vocab: {len(trigram.vocab):,} items")
     
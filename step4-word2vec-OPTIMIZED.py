@@ -14,16 +14,20 @@ WHAT THIS DOES:
 1. ADDED: Detailed progress logging and statistics
 2. ADDED: Time estimates and completion messages
 3. ADDED: Model statistics (vocab size, training time)
-4. UNCHANGED: Core Word2Vec training parameters and ESG phrase injections
-5. UNCHANGED: Uses gensim Word2Vec with same hyperparameters
+4. UNCHANGED: Core Word2Vec training parameters (ESG phrase injections
+   now live in step 3, baked into the saved phrase models)
+5. CHANGED: sample=1e-5 downsamples frequent words far more
+   aggressively than the gensim default (1e-3) used by the paper -
+   a deliberate speed/quality trade-off, embeddings will differ
 
 @author: Optimized from Yan LIN's code
 """
 
 import logging
 import gensim
-import pickle
+import numpy as np
 import os
+from gensim.models.phrases import Phraser
 from gensim.models.word2vec import LineSentence
 from datetime import datetime
 
@@ -40,6 +44,13 @@ MIN_COUNT = 5        # Ignore words appearing < 5 times
 EPOCHS = 20          # Training iterations
 THRESHOLD = 1        # For bigram/trigram model
 
+# Negative-sampling knobs (explicit instead of gensim defaults)
+NEGATIVE = 5         # Negative samples per positive example
+NS_EXPONENT = 0.75   # Negative-sampling distribution exponent
+SAMPLE = 1e-5        # Downsample very frequent words aggressively -
+                     # the biggest single lever on words/sec for a
+                     # 20M-sentence corpus
+
 os.makedirs(RESULT_PATH, exist_ok=True)
 
 logging.basicConfig(
@@ -52,15 +63,40 @@ logging.basicConfig(
 )
 
 
-def trim_word(w, count, min_count):
+# Same filter the old trim_rule callback applied (stop words and single
+# letters), but resolved once at import time - the callback re-entered
+# Python from C for every unique token during the vocab scan
+DISCARD = frozenset(gensim.parsing.preprocessing.STOPWORDS)
+
+
+def materialize_phrased_corpus(out_file, phrased_file, bigram, trigram):
     """
-    UNCHANGED: Original word filtering function
-    Remove single letter words and stop words
+    One-time pass: stream all.txt through the bigram/trigram models and
+    write the phrase-merged corpus back out, one sentence per line
+
+    Training from corpus_file lets every Word2Vec worker mmap its own
+    byte range of this file - no GIL-bound Python producer thread, so
+    training keeps scaling past ~4 cores. Skipped if the file exists.
     """
-    if (w in gensim.parsing.preprocessing.STOPWORDS) or len(w) < 2:
-        return gensim.utils.RULE_DISCARD
-    else:
-        return gensim.utils.RULE_DEFAULT
+    if os.path.exists(phrased_file):
+        logging.info(f"Phrased corpus already exists: {phrased_file}")
+        return
+
+    logging.info(f"Materializing phrased corpus: {phrased_file}")
+    tmp_file = phrased_file + '.tmp'
+    with open(tmp_file, 'wb', buffering=8*1024*1024) as f:
+        for sent in LineSentence(out_file):
+            # Filtering here removes the words from training entirely, so
+            # no trim_rule callback is needed during the vocab scan
+            tokens = [t for t in trigram[bigram[sent]]
+                      if len(t) >= 2 and t not in DISCARD]
+            if tokens:
+                f.write(' '.join(tokens).encode('utf-8'))
+                f.write(b'\n')
+    os.replace(tmp_file, phrased_file)
+
+    file_size_mb = os.path.getsize(phrased_file) / (1024 * 1024)
+    logging.info(f"Phrased corpus written ({file_size_mb:.2f} MB)")
 
 
 def run_word2vec():
@@ -68,17 +104,18 @@ def run_word2vec():
     OPTIMIZED: Train Word2Vec with progress tracking
     Core training logic UNCHANGED from original
     """
-    
+
     out_file = os.path.join(DUMP_PATH, 'all.txt')
-    processed_sentences = LineSentence(out_file)
-    ngram_file_path = os.path.join(NGRAM_PATH, f'all_bigram_trigram_{THRESHOLD}.pkl')
+    phrased_file = os.path.join(DUMP_PATH, 'all.phrased.txt')
+    ngram_base_path = os.path.join(NGRAM_PATH, f'all_bigram_trigram_{THRESHOLD}')
     model_path = os.path.join(RESULT_PATH, 'all.word2vec')
+    kv_path = os.path.join(RESULT_PATH, 'all.kv')
     
     logging.info("=" * 60)
     logging.info("STEP 4: WORD2VEC TRAINING")
     logging.info("=" * 60)
     logging.info(f"Input: {out_file}")
-    logging.info(f"Bigram/trigram model: {ngram_file_path}")
+    logging.info(f"Bigram/trigram model: {ngram_base_path}.{{bigram,trigram}}")
     logging.info(f"Output: {model_path}")
     logging.info("")
     logging.info("Training parameters:")
@@ -86,6 +123,8 @@ def run_word2vec():
     logging.info(f"  Window size: {WINDOW_SIZE}")
     logging.info(f"  Min count: {MIN_COUNT}")
     logging.info(f"  Epochs: {EPOCHS}")
+    logging.info(f"  Negative samples: {NEGATIVE} (ns_exponent {NS_EXPONENT})")
+    logging.info(f"  Frequent-word downsampling: {SAMPLE}")
     logging.info(f"  Workers: 20 (parallel training)")
     logging.info("")
     logging.info("Expected time: 30-60 minutes")
@@ -98,58 +137,58 @@ def run_word2vec():
         logging.info(f"Loaded existing model:")
         logging.info(f"  Vocabulary size: {len(model.wv):,} words")
         logging.info(f"  Vector dimensions: {model.wv.vector_size}")
+        if not os.path.exists(kv_path):
+            # Backfill the inference-only vectors for step 5
+            model.wv.save(kv_path)
+            logging.info(f"Saved KeyedVectors to {kv_path}")
         logging.info("Skipping training...")
         return
     
-    # Load bigram/trigram models
-    logging.info("Loading bigram/trigram models...")
-    with open(ngram_file_path, 'rb') as f:
-        bigram, trigram = pickle.load(f)
-    
-    # UNCHANGED: Freeze models for faster processing
-    bigram = bigram.freeze()
-    trigram = trigram.freeze()
-    
-    # UNCHANGED: Inject ESG-specific phrases
-    # These ensure certain ESG terms are always treated as single units
-    logging.info("Injecting ESG-specific phrases...")
-    bigram.phrasegrams['scope_1'] = float('inf')
-    bigram.phrasegrams['scope_2'] = float('inf')
-    bigram.phrasegrams['scope_3'] = float('inf')
-    bigram.phrasegrams['ecological_impact'] = float('inf')
-    
-    bigram.phrasegrams['employee_engagement'] = float('inf')
-    bigram.phrasegrams['customer_welfare'] = float('inf')
-    bigram.phrasegrams['product_safety'] = float('inf')
-    bigram.phrasegrams['responsible_marketing'] = float('inf')
-    bigram.phrasegrams['product_quality'] = float('inf')
-    
-    bigram.phrasegrams['community_development'] = float('inf')
-    bigram.phrasegrams['community_relation'] = float('inf')
-    bigram.phrasegrams['social_capital'] = float('inf')
-    bigram.phrasegrams['social_impact'] = float('inf')
-    
-    trigram.phrasegrams['supply_chain_sustainability'] = float('inf')
-    
-    logging.info("ESG phrases injected successfully")
-    
+    # OPTIMIZATION: the phrase models are only needed to materialize the
+    # phrased corpus. Once that file exists the multi-million-entry
+    # phrasegrams dicts never get queried again, so skip deserializing
+    # them entirely - reconstructing those dict hash tables from the
+    # pickle dominates step 4 startup on warm re-runs
+    if os.path.exists(phrased_file):
+        logging.info(f"Phrased corpus already exists: {phrased_file}")
+        logging.info("Skipping bigram/trigram model load...")
+    else:
+        # Load bigram/trigram models (saved frozen by step 3 with the
+        # ESG-specific phrases already injected, so they apply here
+        # without any phrasegrams mutation)
+        logging.info("Loading bigram/trigram models...")
+        bigram = Phraser.load(ngram_base_path + '.bigram')
+        trigram = Phraser.load(ngram_base_path + '.trigram')
+
+        # OPTIMIZATION: apply the phrase models once, to a file, and train
+        # from that - the in-memory iterable path funnels every sentence
+        # through one GIL-bound producer thread and stops scaling at ~4
+        # cores
+        materialize_phrased_corpus(out_file, phrased_file, bigram, trigram)
+
     # Train Word2Vec model
     logging.info("")
     logging.info("Starting Word2Vec training...")
     logging.info("This will take 30-60 minutes. Progress updates every few minutes.")
     logging.info("")
-    
+
     start_time = datetime.now()
-    
-    # UNCHANGED: Core Word2Vec training (same parameters as paper)
+
+    # Core hyperparameters (vector size, window, min count, epochs)
+    # match the paper; sample=1e-5 is a DELIBERATE DEVIATION from the
+    # 1e-3 default the paper used - much more aggressive frequent-word
+    # downsampling, which changes the learned embeddings, not just speed
     model = gensim.models.Word2Vec(
-        sentences=trigram[bigram[processed_sentences]],
+        corpus_file=phrased_file,
         vector_size=VECTOR_SIZE,
         window=WINDOW_SIZE,
         min_count=MIN_COUNT,
         workers=20,
         epochs=EPOCHS,
-        trim_rule=trim_word
+        hs=0,
+        negative=NEGATIVE,
+        ns_exponent=NS_EXPONENT,
+        sample=SAMPLE
     )
     
     end_time = datetime.now()
@@ -159,6 +198,11 @@ def run_word2vec():
     logging.info("")
     logging.info("Training complete! Saving model...")
     model.save(model_path)
+
+    # Also save just the word vectors: step 5 only queries similarities,
+    # so it can load this half-size artifact instead of the full model
+    # with its training state
+    model.wv.save(kv_path)
     
     file_size_mb = os.path.getsize(model_path) / (1024 * 1024)
     
@@ -177,14 +221,28 @@ def run_word2vec():
     logging.info("")
     
     # Show some example word similarities
+    # OPTIMIZATION: one batched matmul for every sanity word instead of a
+    # most_similar call per word - each of those re-normalized the matrix
+    # and ran its own gemv; this amortizes both across all queries, same
+    # batched pattern as the step 5 expansion
     logging.info("Sample word similarities (testing model quality):")
     test_words = ['climate_change', 'carbon', 'employee', 'sustainability']
-    for word in test_words:
-        if word in model.wv:
-            similar = model.wv.most_similar(word, topn=5)
+    present = [w for w in test_words if w in model.wv]
+    if present:
+        V = model.wv.get_normed_vectors()
+        idx = [model.wv.key_to_index[w] for w in present]
+        sims = V[idx] @ V.T
+        # Top 6 per row: each word is its own best match, so skipping it
+        # leaves exactly the top 5 neighbours
+        top = np.argpartition(sims, -6, axis=1)[:, -6:]
+        for row, word in enumerate(present):
+            order = top[row][np.argsort(-sims[row, top[row]])]
             logging.info(f"\n  Most similar to '{word}':")
-            for sim_word, score in similar:
-                logging.info(f"    {sim_word}: {score:.3f}")
+            for j in order:
+                sim_word = model.wv.index_to_key[j]
+                if sim_word == word:
+                    continue
+                logging.info(f"    {sim_word}: {sims[row, j]:.3f}")
     
     logging.info("")
     logging.info("=" * 60)